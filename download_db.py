@@ -1,74 +1,112 @@
 import os
 import requests
-from requests.exceptions import ChunkedEncodingError
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+from urllib3.util.retry import Retry
 import sqlite3
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from time import time
 from rich import print
 
-# Verifica e cria a pasta "Downloads" se não existir
+# Pasta "Downloads" onde as fontes são salvas
 downloads_folder = os.path.join(os.getcwd(), "Downloads")
-if not os.path.exists(downloads_folder):
-    os.makedirs(downloads_folder)
 
 # Define as letras do alfabeto e o caractere #
 letras = "abcdefghijklmnopqrstuvwxyz#"
 
-# Função para baixar uma fonte
+# Sessão compartilhada entre as threads: reaproveita as conexões keep-alive com o dl.dafont.com
+session = requests.Session()
+session.headers["User-Agent"] = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/94.0.4606.81 Safari/537.36"
+session.mount("https://", HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+))
+
+# Função para baixar uma fonte; retorna True se o download foi concluído
 def download_font(font_info):
     nome = font_info["nome"]
     link_download = font_info["link_download"]
 
-    # Verifica se a fonte já foi baixada
     font_file = nome.replace("-", "_") + ".zip"
     font_path = os.path.join(downloads_folder, nome[0].upper(), font_file)
-    if os.path.exists(font_path):
-        return
 
+    # Baixa primeiro para um .part; o .zip só aparece quando o download termina
+    part_path = font_path + ".part"
     try:
-        # Realiza o download da fonte
-        response = requests.get(link_download)
-        with open(font_path, "wb") as file:
-            file.write(response.content)
-            print(f"[green]Fonte baixada:[/green] {font_path}")
-    except ChunkedEncodingError as e:
+        # Realiza o download da fonte em blocos, sem carregar o arquivo inteiro na memória
+        with session.get(link_download, stream=True, timeout=(5, 30)) as response:
+            response.raise_for_status()
+            with open(part_path, "wb") as file:
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    file.write(chunk)
+        os.replace(part_path, font_path)
+        print(f"[green]Fonte baixada:[/green] {font_path}")
+        return True
+    except (RequestException, OSError) as e:
+        # Erros de rede e de disco (sem espaço, sem permissão) só afetam esta fonte; remove o .part que sobrou, se der
+        try:
+            os.remove(part_path)
+        except OSError:
+            pass
         print(f"[bold red]Erro ao baixar fonte: {e}[/bold red]")
+        return False
 
-# Conecta-se ao banco de dados SQLite3
-conn = sqlite3.connect("fontes.db")
-cursor = conn.cursor()
+def main():
+    # Cria a pasta "Downloads" se não existir
+    os.makedirs(downloads_folder, exist_ok=True)
 
-# Função para verificar se uma fonte já foi baixada
-def verify_font_downloaded(font_info):
-    nome = font_info["nome"]
-    font_file = nome.replace("-", "_") + ".zip"
-    font_path = os.path.join(downloads_folder, nome[0].upper(), font_file)
-    return os.path.exists(font_path)
+    # Conecta-se ao banco de dados SQLite3 somente para leitura
+    # Sem immutable: um -wal deixado por uma atualização interrompida ainda é lido
+    conn = sqlite3.connect("file:fontes.db?mode=ro", uri=True)
+    # Ajusta o SQLite: cache de páginas maior, leitura via mmap e temporários em memória
+    conn.executescript("""
+        PRAGMA cache_size = -32000;
+        PRAGMA mmap_size = 268435456;
+        PRAGMA temp_store = MEMORY;
+        PRAGMA busy_timeout = 30000;
+        PRAGMA trusted_schema = OFF;
+    """)
+    cursor = conn.cursor()
+
+    # Busca todas as fontes numa única consulta e separa por letra inicial
+    fontes_por_letra = {letra: [] for letra in letras}
+    for nome, link_download in cursor.execute("SELECT nome, link_download FROM fontes"):
+        fontes_letra = fontes_por_letra.get(nome[:1].lower())
+        if fontes_letra is not None:
+            fontes_letra.append({"nome": nome, "link_download": link_download})
 
-# Percorre as letras em multithread
-with ThreadPoolExecutor() as executor:
-    for letra in letras:
-        # Cria a pasta para a letra, se não existir
+    # Percorre as letras juntando as fontes que ainda faltam baixar
+    fontes_nao_baixadas = []
+    for letra, fontes in fontes_por_letra.items():
+        # Cria a pasta para a letra antes de iniciar os downloads, se não existir
         letra_folder = os.path.join(downloads_folder, letra.upper())
-        if not os.path.exists(letra_folder):
-            os.makedirs(letra_folder)
+        os.makedirs(letra_folder, exist_ok=True)
 
-        # Busca as fontes da letra no banco de dados
-        cursor.execute("SELECT nome, link_download FROM fontes WHERE nome LIKE ?", [f"{letra}%"])
-        fontes = [{"nome": nome, "link_download": link_download} for nome, link_download in cursor.fetchall()]
+        # Filtra as fontes que ainda não foram baixadas com uma única leitura da pasta
+        existentes = {entry.name for entry in os.scandir(letra_folder)}
+        fontes_nao_baixadas.extend(fonte for fonte in fontes if fonte["nome"].replace("-", "_") + ".zip" not in existentes)
 
-        # Filtra as fontes que ainda não foram baixadas
-        fontes_nao_baixadas = [fonte for fonte in fontes if not verify_font_downloaded(fonte)]
+    # Baixa todas as fontes num único pool, sem esperar uma letra terminar para começar a próxima
+    # e conta os downloads concluídos à medida que terminam, sem percorrer a pasta no final
+    baixadas = 0
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        futures = [executor.submit(download_font, fonte) for fonte in fontes_nao_baixadas]
+        try:
+            for future in as_completed(futures):
+                baixadas += future.result()
+        except BaseException:
+            # Com Ctrl+C ou erro, cancela os downloads ainda na fila em vez de esperar todos terminarem
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
 
-        # Baixa as fontes em multithread
-        results = executor.map(download_font, fontes_nao_baixadas)
-        for _ in results:
-            pass
+    # Fecha a conexão com o banco de dados
+    conn.close()
 
-# Fecha a conexão com o banco de dados
-conn.close()
+    # Organiza a saída usando Rich
+    print("\n[bold green]Download de fontes concluído![/bold green]")
+    print(f"[bold]Pasta de downloads:[/bold] {downloads_folder}")
+    print(f"[bold]Total de fontes baixadas:[/bold] {baixadas}")
 
-# Organiza a saída usando Rich
-print("\n[bold green]Download de fontes concluído![/bold green]")
-print(f"[bold]Pasta de downloads:[/bold] {downloads_folder}")
-print(f"[bold]Total de fontes baixadas:[/bold] {sum([len(files) for _, _, files in os.walk(downloads_folder)])}")
+if __name__ == "__main__":
+    main()
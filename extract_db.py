@@ -1,39 +1,101 @@
 import os
+import shutil
 import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 from rich import print
 
-# Verifica e cria a pasta "Fonts" se não existir
+# Pasta "Fonts" onde as fontes extraídas são salvas
 fonts_folder = os.path.join(os.getcwd(), "Fonts")
-if not os.path.exists(fonts_folder):
-    os.makedirs(fonts_folder)
+
+# Caracteres que o Windows não aceita em nomes de arquivo; trocados por "_" como o zipfile.extract faz
+windows_invalid_chars = str.maketrans(':<>|"?*', "_______")
+
+# Função para montar o nome do arquivo de uma fonte do .zip, sem as subpastas
+def font_filename(member):
+    filename = os.path.basename(member.filename)
+    if os.path.sep == "\\":
+        filename = filename.translate(windows_invalid_chars)
+    return filename
 
 # Função para extrair as fontes de um arquivo .zip
+# Retorna True se o arquivo foi extraído e False se foi pulado ou deu erro
 def extract_fonts(zip_file, target_folder):
     try:
         with zipfile.ZipFile(zip_file, "r") as zf:
-            for member in zf.infolist():
-                if member.filename.lower().endswith((".otf", ".ttf")):
-                    member.filename = os.path.basename(member.filename)
-                    zf.extract(member, target_folder)
+            # Cada fonte vai direto para a pasta de destino, sem as subpastas do .zip
+            members = [
+                (member, os.path.join(target_folder, font_filename(member)))
+                for member in zf.infolist()
+                if member.filename.lower().endswith((".otf", ".ttf"))
+            ]
+
+            # Extrai só as fontes que ainda não estão na pasta de destino; como cada fonte é gravada num .part
+            # e renomeada no fim, um arquivo existente está completo. Uma fonte de mesmo nome vinda de outro .zip
+            # da mesma letra não é sobrescrita
+            members = [(member, font_path) for member, font_path in members if not os.path.exists(font_path)]
+
+            # Pula o .zip se todas as fontes dele já estão na pasta de destino
+            if not members:
+                return False
+
+            # Copia cada fonte em blocos de 1 MiB para um .part; a fonte só aparece quando a cópia termina
+            # O .part leva o PID: outro processo pode estar extraindo uma fonte de mesmo nome de outro .zip
+            for member, font_path in members:
+                part_path = f"{font_path}.{os.getpid()}.part"
+                try:
+                    with zf.open(member) as source, open(part_path, "wb") as target:
+                        shutil.copyfileobj(source, target, 1 << 20)
+                    os.replace(part_path, font_path)
+                except BaseException:
+                    try:
+                        os.remove(part_path)
+                    except FileNotFoundError:
+                        pass
+                    raise
         print(f"[green]Fontes extraídas:[/green] {os.path.basename(zip_file)}")
-    except zipfile.BadZipFile:
+        return True
+    except (zipfile.BadZipFile, zlib.error):
         print(f"[red]Erro ao extrair fontes: Arquivo ZIP inválido ou corrompido: {os.path.basename(zip_file)}[/red]")
+        return False
+    except OSError as e:
+        print(f"[red]Erro ao extrair fontes de {os.path.basename(zip_file)}: {e}[/red]")
+        return False
+
+# Percorre recursivamente uma pasta devolvendo os arquivos .zip
+def iter_zips(folder):
+    for entry in os.scandir(folder):
+        if entry.is_dir():
+            yield from iter_zips(entry.path)
+        elif entry.name.lower().endswith(".zip"):
+            yield entry
+
+def main():
+    # Cria a pasta "Fonts" se não existir
+    os.makedirs(fonts_folder, exist_ok=True)
+
+    # Percorre os arquivos .zip em "Downloads", criando antes as pastas de destino
+    zip_files = []
+    target_folders = []
+    pastas_criadas = set()
+    if os.path.isdir("Downloads"):
+        for entry in iter_zips("Downloads"):
+            target_folder = os.path.join(fonts_folder, entry.name[0].upper())
+            # Cria cada pasta de destino uma única vez, e não a cada arquivo
+            if target_folder not in pastas_criadas:
+                os.makedirs(target_folder, exist_ok=True)
+                pastas_criadas.add(target_folder)
+            zip_files.append(entry.path)
+            target_folders.append(target_folder)
+
+    # Extrai as fontes em paralelo, um processo por núcleo: a descompressão usa CPU
+    with ProcessPoolExecutor() as executor:
+        extracted_fonts = sum(executor.map(extract_fonts, zip_files, target_folders, chunksize=16))
+
+    # Organiza a saída usando Rich
+    print("\n[bold green]Extração de fontes concluída![/bold green]")
+    print(f"[bold]Pasta de fontes:[/bold] {fonts_folder}")
+    print(f"[bold]Total de fontes extraídas:[/bold] {extracted_fonts}")
 
-# Percorre os arquivos .zip em "Downloads"
-extracted_fonts = 0
-for root, dirs, files in os.walk("Downloads"):
-    for file in files:
-        if file.lower().endswith(".zip"):
-            zip_file = os.path.join(root, file)
-
-            # Extrai as fontes do arquivo .zip
-            target_folder = os.path.join(fonts_folder, file[0].upper())
-            if not os.path.exists(target_folder):
-                os.makedirs(target_folder)
-            extract_fonts(zip_file, target_folder)
-            extracted_fonts += 1
-
-# Organiza a saída usando Rich
-print("\n[bold green]Extração de fontes concluída![/bold green]")
-print(f"[bold]Pasta de fontes:[/bold] {fonts_folder}")
-print(f"[bold]Total de fontes extraídas:[/bold] {extracted_fonts}")
+if __name__ == "__main__":
+    main()
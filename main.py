@@ -1,23 +1,39 @@
-import os
 from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
 
 console = Console()
 
+# Os scripts são importados só quando usados e rodam no próprio processo do menu
+
 def update_database():
     console.print("[bold]Atualizando o banco de dados...[/bold]")
-    os.system("python update_db.py")
+    try:
+        import update_db
+        update_db.main()
+    except Exception as e:
+        console.print(f"[bold red]Erro ao atualizar o banco de dados: {e}[/bold red]")
+        return
     console.print("[bold green]Banco de dados atualizado![/bold green]")
 
 def download_database():
     console.print("[bold]Baixando fontes...[/bold]")
-    os.system("python download_db.py")
+    try:
+        import download_db
+        download_db.main()
+    except Exception as e:
+        console.print(f"[bold red]Erro ao baixar fontes: {e}[/bold red]")
+        return
     console.print("[bold green]Processo concluído![/bold green]")
     
 def extract_fonts():
     console.print("[bold]Extraindo fontes...[/bold]")
-    os.system("python extract_db.py")
+    try:
+        import extract_db
+        extract_db.main()
+    except Exception as e:
+        console.print(f"[bold red]Erro ao extrair fontes: {e}[/bold red]")
+        return
     console.print("[bold green]Processo concluído![/bold green]")
 
 def main_menu():
@@ -1,6 +1,13 @@
-import os
+import re
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+try:
+    # Parser em C, bem mais rápido; opcional
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
 import sqlite3
 from concurrent.futures import ThreadPoolExecutor
 from time import time
@@ -10,99 +17,137 @@ from rich import print
 base_url = "https://www.dafont.com/pt/alpha.php?lettre="
 letras = "abcdefghijklmnopqrstuvwxyz#"
 
-# Nome do arquivo .journey temporário
-temp_file = "fontes.journey"
+# Links de paginação da listagem ("...lettre=a&page=N"), lidos direto do HTML bruto
+page_pattern = re.compile(rb"lettre=[^&\"'<>]*&(?:amp;)?page=(\d+)")
 
-# Conecte-se ao banco de dados SQLite3
-conn = sqlite3.connect("fontes.db")
-cursor = conn.cursor()
-
-# Crie a tabela para armazenar as fontes, se ela não existir
-cursor.execute("""CREATE TABLE IF NOT EXISTS fontes (
-                    nome TEXT,
-                    link TEXT,
-                    link_download TEXT
-                )""")
+# Monta apenas os blocos de fonte da listagem, ignorando o resto da página
+font_divs = SoupStrainer("div", class_="lv1left dfbg")
 
 # Define o cabeçalho User-Agent
 headers = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/94.0.4606.81 Safari/537.36"
 }
 
+# Sessão compartilhada entre as threads para reaproveitar as conexões keep-alive
+session = requests.Session()
+session.headers.update(headers)
+session.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+))
+
+# Função para descobrir quantas páginas a listagem de uma letra possui
+def get_last_page(url):
+    response = session.get(url, timeout=(5, 30))
+    # A maior página citada na paginação é a última
+    return max((int(page) for page in page_pattern.findall(response.content)), default=1)
+
 # Função para coletar informações das fontes em uma página
 def collect_font_info(url):
-    response = requests.get(url, headers=headers)
-    soup = BeautifulSoup(response.content, "html.parser")
-    divs_fontes = soup.find_all("div", class_="lv1left dfbg")
+    response = session.get(url, timeout=(5, 30))
+    if LexborHTMLParser is not None:
+        tree = LexborHTMLParser(response.content)
+        hrefs = [div_fonte.css_first("a").attributes["href"] for div_fonte in tree.css("div.lv1left.dfbg")]
+    else:
+        soup = BeautifulSoup(response.content, "lxml", parse_only=font_divs)
+        hrefs = [div_fonte.find("a")["href"] for div_fonte in soup.find_all("div", class_="lv1left dfbg")]
     fontes = []
-    for div_fonte in divs_fontes:
-        link = "https://www.dafont.com" + div_fonte.find("a")["href"]
+    for href in hrefs:
+        link = "https://www.dafont.com" + href
         nome = link.split("/")[-1].replace(".font", "").replace("www.dafont.com", "")
         link = f"https://www.dafont.com/pt/{nome}.font"
         link_download = f"https://dl.dafont.com/dl/?f={nome.replace('-', '_')}"
         fontes.append({"nome": nome, "link": link, "link_download": link_download})
     return fontes
 
-# Função para verificar se as fontes já existem no banco de dados
-def verify_font_exists(fontes):
-    cursor.execute("SELECT nome FROM fontes WHERE nome IN (" + ",".join(["?"] * len(fontes)) + ")", [fonte["nome"] for fonte in fontes])
-    resultados = cursor.fetchall()
-    fontes_existentes = [resultado[0] for resultado in resultados]
-    return fontes_existentes
-
-# Função para inserir as fontes no banco de dados
-def insert_fontes(fontes):
-    for fonte in fontes:
-        cursor.execute("INSERT INTO fontes VALUES (?, ?, ?)", (fonte["nome"], fonte["link"], fonte["link_download"]))
-
-# Percorra as letras
-for letra in letras:      
-    
-    try: 
-        os.remove(temp_file)  # Deleta o arquivo temporário
-    except:
-        pass
-    
-      
-    url = base_url + letra
-    response = requests.get(url, headers=headers)
-    soup = BeautifulSoup(response.content, "html.parser")
-    
-    div_noindex = soup.find("div", class_="noindex")
-    last_page = int(div_noindex.find_all("a")[-2]["href"].split("=")[-1])
-    
-    print(f"[bold]Letra {letra.upper()}: {last_page} páginas disponíveis[/bold]")
-    
-    fontes_coletadas = []
+# Função para inserir as fontes no banco de dados; as que já existem são ignoradas pelo índice único
+# Retorna quantas fontes novas foram inseridas
+def insert_fontes(cursor, fontes):
+    cursor.executemany("INSERT OR IGNORE INTO fontes VALUES (?, ?, ?)", [(fonte["nome"], fonte["link"], fonte["link_download"]) for fonte in fontes])
+    return cursor.rowcount
+
+# Função que coleta as fontes de todas as letras e grava as novas no banco de dados
+def update_fontes(conn):
+    cursor = conn.cursor()
+
+    # Crie a tabela para armazenar as fontes, se ela não existir
+    cursor.execute("""CREATE TABLE IF NOT EXISTS fontes (
+                        nome TEXT,
+                        link TEXT,
+                        link_download TEXT
+                    )""")
+
+    # Garanta nomes únicos com um índice; em bancos antigos remova antes as linhas repetidas
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_fontes_nome'")
+    if cursor.fetchone() is None:
+        cursor.execute("DELETE FROM fontes WHERE rowid NOT IN (SELECT min(rowid) FROM fontes GROUP BY nome)")
+        cursor.execute("CREATE UNIQUE INDEX idx_fontes_nome ON fontes (nome)")
+        conn.commit()
+
     start_time = time()
-    
-    with ThreadPoolExecutor() as executor:
-        urls = [f"{url}&page={page}" for page in range(1, last_page + 1)]
-        results = executor.map(collect_font_info, urls)
-        for result in results:
-            fontes_coletadas.extend(result)
-    
-    end_time = time()
-    print(f"[bold]Tempo decorrido na coleta de fontes: {end_time - start_time} segundos[/bold]")
-    
-    fontes_existentes = verify_font_exists(fontes_coletadas)
-    
-    fontes_novas = [fonte for fonte in fontes_coletadas if fonte["nome"] not in fontes_existentes]
-    
-    if fontes_novas:
-        insert_fontes(fontes_novas)
-        print("[bold green]Fontes novas adicionadas ao banco de dados[/bold green]")
-    else:
-        print("[bold blue]Nenhuma fonte nova encontrada[/bold blue]")
 
-    # Faça commit das alterações no banco de dados
-    conn.commit()
+    # Um único pool para todas as letras: as páginas de letras diferentes são baixadas ao mesmo tempo
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        # Descubra primeiro quantas páginas cada letra possui
+        urls_letras = [base_url + letra for letra in letras]
+        last_pages = list(executor.map(get_last_page, urls_letras))
+
+        for letra, last_page in zip(letras, last_pages):
+            print(f"[bold]Letra {letra.upper()}: {last_page} páginas disponíveis[/bold]")
+
+        # Envie todas as páginas de todas as letras de uma vez; os resultados chegam na mesma ordem
+        urls = [f"{url}&page={page}" for url, last_page in zip(urls_letras, last_pages) for page in range(1, last_page + 1)]
+        paginas = executor.map(collect_font_info, urls)
+
+        # Percorra as letras, gravando cada uma assim que suas páginas chegam
+        for letra, last_page in zip(letras, last_pages):
+            # Junte as páginas coletadas da letra
+            fontes_coletadas = []
+            for _ in range(last_page):
+                fontes_coletadas.extend(next(paginas))
+
+            print(f"[bold]Letra {letra.upper()}: {len(fontes_coletadas)} fontes coletadas[/bold]")
+
+            fontes_novas = insert_fontes(cursor, fontes_coletadas)
+
+            if fontes_novas:
+                print(f"[bold green]{fontes_novas} fontes novas adicionadas ao banco de dados[/bold green]")
+            else:
+                print("[bold blue]Nenhuma fonte nova encontrada[/bold blue]")
+
+            # Faça commit das alterações no banco de dados
+            conn.commit()
+
+    end_time = time()
+    print(f"[bold]Tempo decorrido na atualização: {end_time - start_time} segundos[/bold]")
 
-    # Limpe o arquivo .journey para receber o novo alfabeto
-    open(temp_file, "w").close()
+def main():
+    # Conecte-se ao banco de dados SQLite3
+    conn = sqlite3.connect("fontes.db")
+    # Ajusta o SQLite: WAL com fsync só no checkpoint durante a atualização, cache de páginas maior, leitura via mmap e temporários em memória
+    conn.executescript("""
+        PRAGMA journal_mode = WAL;
+        PRAGMA synchronous = NORMAL;
+        PRAGMA cache_size = -32000;
+        PRAGMA mmap_size = 268435456;
+        PRAGMA temp_store = MEMORY;
+        PRAGMA busy_timeout = 30000;
+        PRAGMA trusted_schema = OFF;
+    """)
+    # O WAL fica só durante a atualização: no fim, mesmo com erro ou Ctrl+C, o banco volta ao journal DELETE
+    # e o fontes.db fica num único arquivo, sem -wal pendente para quem o lê depois
+    try:
+        update_fontes(conn)
 
-# Feche a conexão com o banco de dados
-conn.close()
+        # Atualiza as estatísticas do planejador (ANALYZE limitado)
+        conn.execute("PRAGMA analysis_limit = 1000")
+        conn.execute("PRAGMA optimize")
+    finally:
+        # Descarte a letra que ficou pela metade, volte ao journal DELETE e feche a conexão com o banco de dados
+        conn.rollback()
+        conn.execute("PRAGMA journal_mode = DELETE")
+        conn.close()
 
-# Exclua os arquivos temporários
-os.remove(temp_file)
+if __name__ == "__main__":
+    main()